@@ -2,6 +2,7 @@
 Data models for the Workout Recommender System
 """
 
+from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 
 from pydantic import BaseModel
@@ -36,7 +37,13 @@ class WorkoutTemplate(BaseModel):
     structure: Dict[str, int]  # workout_type: count
 
 
+@dataclass(slots=True)
+class DayPlan:
+    type: str
+    exercises: List[Dict[str, Any]]
+
+
 class WorkoutPlan(BaseModel):
     user_id: str
     week_number: int
-    days: Dict[str, Dict[str, Any]]
+    days: Dict[str, DayPlan]
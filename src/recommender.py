@@ -2,12 +2,202 @@
 Main Recommender Engine for Workout Plans
 """
 
+import functools
+import operator
 import os
+import random
+import sys
 from collections import defaultdict
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Any, Tuple
+
+import numpy as np
+
+from .data_models import DayPlan, UserProfile, WorkoutPlan
+from .utils import load_json_list, load_json_obj
+
+# Shared generator for exercise selection
+_rng = random.Random()
+
+_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_DAYS_SET = frozenset(_DAYS)
+
+_USER_FIELDS = operator.attrgetter(
+    "injuries", "equipment", "preferred_workouts", "fitness_level", "goal", "past_workouts"
+)
+
+
+def _intern_exercise(exercise: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return a copy of the exercise with its matching vocabulary interned and its lists frozen as tuples"""
+    interned = dict(exercise)
+    for key in ("exercise_type", "intensity", "difficulty"):
+        if isinstance(interned.get(key), str):
+            interned[key] = sys.intern(interned[key])
+    for key in ("muscle_groups", "injury_restrictions", "equipment_needed"):
+        if isinstance(interned.get(key), list):
+            interned[key] = tuple(sys.intern(v) if isinstance(v, str) else v for v in interned[key])
+    # Exercises are shared across recommenders and plans, so no nested list may stay mutable
+    if isinstance(interned.get("alternatives"), list):
+        interned["alternatives"] = tuple(interned["alternatives"])
+    return interned
+
+
+# Fallback data, shared read-only between recommenders
+_DEFAULT_EXERCISES = tuple(MappingProxyType(_intern_exercise(exercise)) for exercise in [
+    {
+        "name": "Dumbbell Thrusters",
+        "exercise_type": "Strength",
+        "muscle_groups": ["Legs", "Shoulders"],
+        "equipment_needed": ["Dumbbells"],
+        "intensity": "High",
+        "difficulty": "Intermediate",
+        "injury_restrictions": ["Shoulder Issue"],
+        "alternatives": ["Bodyweight Squats"]
+    },
+    {
+        "name": "Step-Ups",
+        "exercise_type": "Strength",
+        "muscle_groups": ["Legs"],
+        "equipment_needed": ["Step"],
+        "intensity": "Moderate",
+        "difficulty": "Beginner",
+        "injury_restrictions": ["Knee Injury"],
+        "alternatives": ["Bodyweight Squats"]
+    },
+    {
+        "name": "Resistance Band Rows",
+        "exercise_type": "Strength",
+        "muscle_groups": ["Back"],
+        "equipment_needed": ["Resistance Bands"],
+        "intensity": "Moderate",
+        "difficulty": "Beginner",
+        "injury_restrictions": ["Shoulder Issue"],
+        "alternatives": ["Seated Rows"]
+    },
+    {
+        "name": "Stationary Bike",
+        "exercise_type": "Cardio",
+        "muscle_groups": ["Legs"],
+        "equipment_needed": ["Stationary Bike"],
+        "intensity": "Moderate",
+        "difficulty": "Beginner",
+        "injury_restrictions": ["Knee Injury"],
+        "alternatives": ["Swimming"]
+    },
+    {
+        "name": "Swimming",
+        "exercise_type": "Cardio",
+        "muscle_groups": ["Full Body"],
+        "equipment_needed": ["Pool"],
+        "intensity": "Moderate",
+        "difficulty": "Beginner",
+        "injury_restrictions": [],
+        "alternatives": ["Water Aerobics"]
+    },
+    {
+        "name": "Bodyweight Squats",
+        "exercise_type": "Strength",
+        "muscle_groups": ["Legs"],
+        "equipment_needed": [],
+        "intensity": "Low",
+        "difficulty": "Beginner",
+        "injury_restrictions": [],
+        "alternatives": ["Wall Sit"]
+    },
+    {
+        "name": "Plank",
+        "exercise_type": "Core",
+        "muscle_groups": ["Core"],
+        "equipment_needed": [],
+        "intensity": "Low",
+        "difficulty": "Beginner",
+        "injury_restrictions": [],
+        "alternatives": ["Side Plank"]
+    },
+    {
+        "name": "Elliptical",
+        "exercise_type": "Cardio",
+        "muscle_groups": ["Full Body"],
+        "equipment_needed": ["Elliptical"],
+        "intensity": "Moderate",
+        "difficulty": "Beginner",
+        "injury_restrictions": ["Knee Injury"],
+        "alternatives": ["Rowing Machine"]
+    }
+])
+
+_DEFAULT_TEMPLATES = MappingProxyType({
+    goal: MappingProxyType(template) for goal, template in {
+        "Weight Loss": {
+            "goal": "Weight Loss",
+            "structure": {
+                "HIIT": 3,
+                "Cardio": 2,
+                "Strength": 1,
+                "Flexibility": 1
+            }
+        },
+        "Muscle Gain": {
+            "goal": "Muscle Gain",
+            "structure": {
+                "Strength": 4,
+                "Core": 1,
+                "Cardio": 1
+            }
+        },
+        "Endurance": {
+            "goal": "Endurance",
+            "structure": {
+                "Cardio": 3,
+                "Circuit": 2
+            }
+        },
+        "General Fitness": {
+            "goal": "General Fitness",
+            "structure": {
+                "Strength": 2,
+                "Cardio": 2,
+                "Flexibility": 1,
+                "Core": 1
+            }
+        },
+        "Rehabilitation": {
+            "goal": "Rehabilitation",
+            "structure": {
+                "Mobility": 3,
+                "Flexibility": 2,
+                "Low-Impact": 2
+            }
+        }
+    }.items()
+})
+
+
+@functools.lru_cache(maxsize=8)
+def _load_exercises_cached(exercises_path: str, mtime_ns: int) -> Tuple[Mapping[str, Any], ...]:
+    """Parse the exercise database once per path and modification time and share it as read-only views"""
+    data = load_json_obj(exercises_path)
+    exercises = data.get("workouts")
+    if not exercises:  # Missing or empty workouts list
+        return ()
+    if not isinstance(exercises, list):
+        exercises = [exercises]
+    return tuple(MappingProxyType(_intern_exercise(exercise)) for exercise in exercises)
 
-from .data_models import UserProfile, WorkoutPlan
-from .utils import load_json_data
+
+@functools.lru_cache(maxsize=8)
+def _load_templates_cached(templates_path: str, mtime_ns: int) -> Tuple[Mapping[str, Any], ...]:
+    """Parse workout templates once per path and modification time; an empty result means use the defaults"""
+    data = load_json_list(templates_path)
+    if not data:  # If empty list returned
+        print("No templates found, using default templates")
+        return ()
+
+    # Validate each template
+    templates = [template for template in data if isinstance(template, dict) and "goal" in template]
+    if not templates:
+        print("No valid templates found in list, using default templates")
+    return tuple(MappingProxyType(template) for template in templates)
 
 
 class WorkoutRecommender:
@@ -27,7 +217,7 @@ class WorkoutRecommender:
 
     Attributes:
         data_path (str): Directory path containing exercise and template JSON data files
-        exercises (List[Dict]): Database of available exercises and their attributes
+        exercises (Tuple[Mapping]): Read-only database of available exercises and their attributes
         templates (List[Dict]): List of workout templates for different goals
         default_template (Dict): Default template structure for general fitness
         templates (Dict): Collection of workout templates for different fitness goals
@@ -37,6 +227,28 @@ class WorkoutRecommender:
         workout_plan = recommender.generate_workout_plan(user_profile)
     """
 
+    # Map workout types to the (lowercased) exercise types that can fill them
+    _TYPE_MAPPING = {
+        workout_type: frozenset(t.lower() for t in exercise_types)
+        for workout_type, exercise_types in {
+            "Strength": ["Strength", "Resistance"],
+            "HIIT": ["HIIT", "Cardio"],
+            "Cardio": ["Cardio", "HIIT"],
+            "Core": ["Strength"],  # Core exercises are usually strength-based
+            "Flexibility": ["Flexibility", "Mobility"],
+            "Mobility": ["Mobility", "Flexibility"]
+        }.items()
+    }
+
+    # Exercise intensity that matches each fitness level
+    _LEVEL_INTENSITY = {"Beginner": "Low", "Intermediate": "Moderate", "Advanced": "High"}
+
+    # Most preferred exercises kept per category; only a few are ever picked from each
+    _PREFERENCE_CAP = 64
+
+    # Candidate lists up to this size are ordered in plain Python, below numpy's fixed cost
+    _SMALL_CANDIDATES = 32
+
     def __init__(self, data_path: str = None):
         """Initialize the recommender with exercise and template data.
         
@@ -54,20 +266,37 @@ class WorkoutRecommender:
 
         self.exercises = self._load_exercises()
         self.templates = self._load_templates()
+        self._ex_cols = self._build_exercise_columns(self.exercises)
+        self._ex_arrays, self._ex_vocab = self._build_score_arrays(self._ex_cols, self.exercises)
+        # Exercise positions listing each equipment item / injury restriction
+        self._equip_postings = self._build_inverted_index(self._ex_cols["equip"])
+        self._injury_postings = self._build_inverted_index(self._ex_cols["injury"])
+        # Number of equipment items each exercise needs
+        self._equip_counts = np.array([len(needed) for needed in self._ex_cols["equip"]], dtype=np.intp)
+        self._name_rank = self._ex_arrays["name_rank"].tolist()
+        # Fitness-level part of every exercise's score, per known level
+        self._level_scores = {level: self._build_level_scores(level) for level in self._LEVEL_INTENSITY}
+        # Safety notes per (catalogue exercise id, sorted injuries); ids are stable while self.exercises holds them
+        self._notes_cache = {}
+        # Injury restriction sets by exercise id, shared with the injury column
+        self._injury_sets = {id(ex): restricted for ex, restricted in zip(self.exercises, self._ex_cols["injury"])}
+        # Later templates override earlier ones for the same goal
+        self._template_by_goal = {
+            t.get("goal"): t for t in self.templates if isinstance(t, Mapping)
+        }
 
-    def _load_exercises(self) -> List[Dict[str, Any]]:
-        """Load exercise database from JSON file"""
+    def _load_exercises(self) -> Tuple[Mapping[str, Any], ...]:
+        """Load exercise database from JSON file
+
+        Returned as a tuple: the filter columns, score arrays and postings are
+        indexed by position and built once, so the database must not change.
+        """
         exercises_path = os.path.join(self.data_path, "exercises.json")
         try:
-            data = load_json_data(exercises_path)
-            if not data:  # If empty list/dict returned
+            exercises = _load_exercises_cached(exercises_path, os.stat(exercises_path).st_mtime_ns)
+            if not exercises:
                 return self._get_default_exercises()
-            # Extract workouts from the nested structure
-            if isinstance(data, dict) and "workouts" in data:
-                exercises = data["workouts"]
-            else:
-                exercises = data
-            return exercises if isinstance(exercises, list) else [exercises]
+            return exercises
         except Exception as e:
             print(f"Error loading exercises: {str(e)}")
             return self._get_default_exercises()
@@ -89,193 +318,82 @@ class WorkoutRecommender:
 
         templates_path = os.path.join(self.data_path, "workout_templates.json")
         try:
-            data = load_json_data(templates_path)
-            if not data:  # If empty list/dict returned
-                print("No templates found, using default templates")
-                return default_templates
-            
-            if isinstance(data, dict):
-                if "goal" in data:  # Single template
-                    return [data]
-                else:  # Dictionary of templates
-                    return [{"goal": key, **value} for key, value in data.items()]
-            elif isinstance(data, list):
-                # Validate each template
-                valid_templates = []
-                for template in data:
-                    if isinstance(template, dict) and "goal" in template:
-                        valid_templates.append(template)
-                
-                if valid_templates:
-                    return valid_templates
-                print("No valid templates found in list, using default templates")
-                return default_templates
-            else:
-                print(f"Unexpected templates format: {type(data)}")
+            templates = _load_templates_cached(templates_path, os.stat(templates_path).st_mtime_ns)
+            if not templates:
                 return default_templates
+            return list(templates)
         except Exception as e:
             print(f"Error loading templates: {str(e)}")
             return default_templates
 
-    def _get_default_exercises(self) -> List[Dict[str, Any]]:
+    def _build_exercise_columns(self, exercises: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Lay out the exercise attributes used for filtering as parallel columns"""
+        return {
+            "name": [ex.get("name", "") for ex in exercises],
+            "type": [ex.get("exercise_type", "Other") for ex in exercises],
+            "intensity": [ex.get("intensity", "Moderate") for ex in exercises],
+            "difficulty": [ex.get("difficulty") for ex in exercises],
+            "equip": [frozenset(ex.get("equipment_needed") or ()) for ex in exercises],
+            "muscles": [frozenset(ex.get("muscle_groups") or ()) for ex in exercises],
+            "injury": [frozenset(ex.get("injury_restrictions") or ()) for ex in exercises],
+        }
+
+    def _build_score_arrays(self, cols: Dict[str, List[Any]],
+                            exercises: List[Dict[str, Any]]) -> Tuple[Dict[str, np.ndarray], Dict[str, Dict[Any, int]]]:
+        """Encode the scoring attributes as integer codes so preferences can be scored with numpy"""
+        arrays = {}
+        vocab = {}
+        for key in ("type", "intensity", "difficulty"):
+            codes = {}
+            arrays[key] = np.array([codes.setdefault(value, len(codes)) for value in cols[key]], dtype=np.intp)
+            vocab[key] = codes
+        # Prefer exercises with detailed parameters
+        arrays["detail"] = np.array(
+            [0.5 if ex.get("sets") and ex.get("reps") else 0.0 for ex in exercises], dtype=float
+        )
+        # Rank of each name in sorted order, used as the secondary sort key
+        name_rank = {name: rank for rank, name in enumerate(sorted(set(cols["name"])))}
+        arrays["name_rank"] = np.array([name_rank[name] for name in cols["name"]], dtype=np.intp)
+        return arrays, vocab
+
+    def _build_inverted_index(self, column: List[FrozenSet[str]]) -> Dict[str, np.ndarray]:
+        """Map each value of a frozenset column to an array of the exercise positions that list it"""
+        postings = defaultdict(list)
+        for row, values in enumerate(column):
+            for value in values:
+                postings[value].append(row)
+        return {value: np.array(rows, dtype=np.intp) for value, rows in postings.items()}
+
+    def _get_default_exercises(self) -> Tuple[Mapping[str, Any], ...]:
         """Default exercise database"""
-        return [
-            {
-                "name": "Dumbbell Thrusters",
-                "exercise_type": "Strength",
-                "muscle_groups": ["Legs", "Shoulders"],
-                "equipment_needed": ["Dumbbells"],
-                "intensity": "High",
-                "difficulty": "Intermediate",
-                "injury_restrictions": ["Shoulder Issue"],
-                "alternatives": ["Bodyweight Squats"]
-            },
-            {
-                "name": "Step-Ups",
-                "exercise_type": "Strength",
-                "muscle_groups": ["Legs"],
-                "equipment_needed": ["Step"],
-                "intensity": "Moderate",
-                "difficulty": "Beginner",
-                "injury_restrictions": ["Knee Injury"],
-                "alternatives": ["Bodyweight Squats"]
-            },
-            {
-                "name": "Resistance Band Rows",
-                "exercise_type": "Strength",
-                "muscle_groups": ["Back"],
-                "equipment_needed": ["Resistance Bands"],
-                "intensity": "Moderate",
-                "difficulty": "Beginner",
-                "injury_restrictions": ["Shoulder Issue"],
-                "alternatives": ["Seated Rows"]
-            },
-            {
-                "name": "Stationary Bike",
-                "exercise_type": "Cardio",
-                "muscle_groups": ["Legs"],
-                "equipment_needed": ["Stationary Bike"],
-                "intensity": "Moderate",
-                "difficulty": "Beginner",
-                "injury_restrictions": ["Knee Injury"],
-                "alternatives": ["Swimming"]
-            },
-            {
-                "name": "Swimming",
-                "exercise_type": "Cardio",
-                "muscle_groups": ["Full Body"],
-                "equipment_needed": ["Pool"],
-                "intensity": "Moderate",
-                "difficulty": "Beginner",
-                "injury_restrictions": [],
-                "alternatives": ["Water Aerobics"]
-            },
-            {
-                "name": "Bodyweight Squats",
-                "exercise_type": "Strength",
-                "muscle_groups": ["Legs"],
-                "equipment_needed": [],
-                "intensity": "Low",
-                "difficulty": "Beginner",
-                "injury_restrictions": [],
-                "alternatives": ["Wall Sit"]
-            },
-            {
-                "name": "Plank",
-                "exercise_type": "Core",
-                "muscle_groups": ["Core"],
-                "equipment_needed": [],
-                "intensity": "Low",
-                "difficulty": "Beginner",
-                "injury_restrictions": [],
-                "alternatives": ["Side Plank"]
-            },
-            {
-                "name": "Elliptical",
-                "exercise_type": "Cardio",
-                "muscle_groups": ["Full Body"],
-                "equipment_needed": ["Elliptical"],
-                "intensity": "Moderate",
-                "difficulty": "Beginner",
-                "injury_restrictions": ["Knee Injury"],
-                "alternatives": ["Rowing Machine"]
-            }
-        ]
+        return _DEFAULT_EXERCISES
 
-    def _get_default_templates(self) -> Dict[str, Any]:
+    def _get_default_templates(self) -> Mapping[str, Any]:
         """Default workout templates"""
-        return {
-            "Weight Loss": {
-                "goal": "Weight Loss",
-                "structure": {
-                    "HIIT": 3,
-                    "Cardio": 2,
-                    "Strength": 1,
-                    "Flexibility": 1
-                }
-            },
-            "Muscle Gain": {
-                "goal": "Muscle Gain",
-                "structure": {
-                    "Strength": 4,
-                    "Core": 1,
-                    "Cardio": 1
-                }
-            },
-            "Endurance": {
-                "goal": "Endurance",
-                "structure": {
-                    "Cardio": 3,
-                    "Circuit": 2
-                }
-            },
-            "General Fitness": {
-                "goal": "General Fitness",
-                "structure": {
-                    "Strength": 2,
-                    "Cardio": 2,
-                    "Flexibility": 1,
-                    "Core": 1
-                }
-            },
-            "Rehabilitation": {
-                "goal": "Rehabilitation",
-                "structure": {
-                    "Mobility": 3,
-                    "Flexibility": 2,
-                    "Low-Impact": 2
-                }
-            }
-        }
+        return _DEFAULT_TEMPLATES
 
-    def _filter_exercises_by_injury(self, exercises: List[Dict], injuries: List[str]) -> List[Dict]:
-        """Filter exercises based on user injuries"""
-        safe_exercises = []
-        for exercise in exercises:
-            # Check if any restriction conflicts with user injuries
-            conflict = False
-            for restriction in exercise.get("injury_restrictions", []):
-                if restriction in injuries:
-                    conflict = True
-                    break
-            if not conflict:
-                safe_exercises.append(exercise)
-        return safe_exercises
-
-    def _filter_exercises_by_equipment(self, exercises: List[Dict], equipment: List[str]) -> List[Dict]:
-        """Filter exercises based on available equipment"""
-        available_exercises = []
-        for exercise in exercises:
-            required_equipment = exercise.get("equipment_needed", [])
-            # If no equipment needed, it's available
-            if not required_equipment:
-                available_exercises.append(exercise)
-            # If equipment needed, check if user has it
-            else:
-                has_equipment = any(eq in equipment for eq in required_equipment)
-                if has_equipment:
-                    available_exercises.append(exercise)
-        return available_exercises
+    def _filter_and_categorize(self, injuries: FrozenSet[str],
+                               equipment: FrozenSet[str]) -> Dict[str, List[int]]:
+        """Filter exercises by injuries and equipment and categorize them by type in one pass.
+
+        Returns positions into ``self.exercises`` grouped by exercise type.
+        """
+        def rows_listing_any(postings: Dict[str, np.ndarray], values: FrozenSet[str]) -> np.ndarray:
+            # Union of the posting lists for the user's values
+            hits = [postings[v] for v in values if v in postings]
+            return np.concatenate(hits) if hits else np.empty(0, dtype=np.intp)
+
+        # Exercises needing no equipment, plus those using any of the user's equipment
+        keep = self._equip_counts == 0
+        keep[rows_listing_any(self._equip_postings, equipment)] = True
+        # Skip exercises whose restrictions overlap the user's injuries
+        keep[rows_listing_any(self._injury_postings, injuries)] = False
+
+        types = self._ex_cols["type"]
+        categorized = defaultdict(list)
+        for i in np.flatnonzero(keep).tolist():
+            categorized[types[i]].append(i)
+        return dict(categorized)
 
     def _categorize_exercises(self, exercises: List[Dict]) -> Dict[str, List[Dict]]:
         """Categorize exercises by type"""
@@ -301,54 +419,66 @@ class WorkoutRecommender:
             }
         }
         
-        # Find the latest template for the goal
-        template = None
-        if isinstance(self.templates, list):
-            # Search for exact match
-            for t in reversed(self.templates):  # Reverse to get latest first
-                if isinstance(t, dict) and t.get("goal") == goal:
-                    template = t.copy()  # Make a copy to avoid modifying original
-                    break
-            
-            # If no match found, try General Fitness
-            if not template:
-                for t in reversed(self.templates):
-                    if isinstance(t, dict) and t.get("goal") == "General Fitness":
-                        template = t.copy()
-                        break
+        # Find the latest template for the goal, falling back to General Fitness.
+        # Loaded templates are shared and read-only, so they are returned as-is.
+        template = self._template_by_goal.get(goal) or self._template_by_goal.get("General Fitness")
         
         # If still no template, use default
         if not template:
-            template = default_template
+            return default_template
         
         # Ensure template has proper structure
-        if not isinstance(template.get("structure"), dict):
-            template["structure"] = default_template["structure"]
-        else:
-            # Convert frequency-based to day-based if needed
-            structure = template["structure"]
-            if not any(day in structure for day in ["Monday", "Tuesday", "Wednesday"]):
-                template["structure"] = default_template["structure"]
+        structure = template.get("structure")
+        if not isinstance(structure, dict):
+            return {**template, "structure": default_template["structure"]}
+        # Convert frequency-based to day-based if needed
+        if not any(day in structure for day in ["Monday", "Tuesday", "Wednesday"]):
+            return {**template, "structure": default_template["structure"]}
         
         return template
 
-    def _apply_user_preferences(self, exercises: List[Dict], 
-                                preferred_types: List[str] = None,
-                                fitness_level: str = "Beginner",
-                                past_workouts: List[Dict] = None) -> List[Dict]:
-        """Apply user preferences to exercise selection based on past workout history"""
-        if not exercises:
-            return []
-            
+    def _build_level_scores(self, fitness_level: str) -> np.ndarray:
+        """Score every exercise on how well it fits a fitness level
+
+        Covers the intensity and difficulty matches and the preference for
+        exercises with detailed parameters.
+        """
+        arrays = self._ex_arrays
+        # Score each distinct attribute value once, then gather per exercise
+        level_intensity = self._LEVEL_INTENSITY.get(fitness_level)
+        level_scores = np.array([
+            intensity == level_intensity for intensity in self._ex_vocab["intensity"]
+        ], dtype=float)
+        difficulty_scores = np.array([
+            difficulty == fitness_level for difficulty in self._ex_vocab["difficulty"]
+        ], dtype=float)
+        return (
+            level_scores[arrays["intensity"]]
+            + difficulty_scores[arrays["difficulty"]]
+            + arrays["detail"]
+        )
+
+    def _score_exercises(self, preferred_types: List[str] = None,
+                         fitness_level: str = "Beginner",
+                         past_workouts: List[Dict] = None) -> np.ndarray:
+        """Score every exercise in the catalogue for one user's preferences and history
+
+        Returns:
+            One score per position in ``self.exercises``; higher is more preferred
+        """
         if preferred_types is None:
             preferred_types = []
             
         if past_workouts is None:
             past_workouts = []
-            
-        # Analyze past workout preferences
-        type_satisfaction = {}
-        intensity_satisfaction = {}
+
+        scores = self._level_scores.get(fitness_level)
+        if scores is None:
+            scores = self._build_level_scores(fitness_level)
+
+        # Analyze past workout preferences as running [sum, count] totals
+        type_stats = defaultdict(lambda: [0.0, 0])
+        intensity_stats = defaultdict(lambda: [0.0, 0])
         for workout in past_workouts:
             if workout.get('completed'):
                 w_type = workout.get('workout_type')
@@ -356,106 +486,108 @@ class WorkoutRecommender:
                 intensity = workout.get('intensity')
                 
                 if w_type:
-                    if w_type not in type_satisfaction:
-                        type_satisfaction[w_type] = []
-                    type_satisfaction[w_type].append(satisfaction)
+                    stats = type_stats[w_type]
+                    stats[0] += satisfaction
+                    stats[1] += 1
                     
                 if intensity:
-                    if intensity not in intensity_satisfaction:
-                        intensity_satisfaction[intensity] = []
-                    intensity_satisfaction[intensity].append(satisfaction)
+                    stats = intensity_stats[intensity]
+                    stats[0] += satisfaction
+                    stats[1] += 1
+
+        # Cold start: with no rated workout types or intensities and no preferred
+        # types, every preference bonus below would be zero
+        if not type_stats and not intensity_stats and not preferred_types:
+            return scores
         
         # Calculate average satisfaction for each type and intensity
-        avg_type_satisfaction = {
-            t: sum(scores)/len(scores) 
-            for t, scores in type_satisfaction.items()
-        }
-        avg_intensity_satisfaction = {
-            i: sum(scores)/len(scores) 
-            for i, scores in intensity_satisfaction.items()
-        }
-            
-        # Score exercises
-        scored_exercises = []
-        for exercise in exercises:
-            score = 0
-            
-            # Match exercise type with preferences
-            exercise_type = exercise.get('exercise_type', '')
-            if exercise_type and exercise_type in preferred_types:
-                score += 2
-                
-            # Match difficulty with fitness level
-            if exercise.get('difficulty') == fitness_level:
-                score += 1
-            
-            # Consider exercise attributes
-            if exercise.get('sets') and exercise.get('reps'):
-                score += 0.5  # Prefer exercises with detailed parameters
-                
-            # Consider intensity appropriateness and past satisfaction
-            intensity = exercise.get('intensity', 'Moderate')
-            if intensity in avg_intensity_satisfaction:
-                satisfaction_score = avg_intensity_satisfaction[intensity]
-                if satisfaction_score >= 4:  # User really liked this intensity
-                    score += 2
-                elif satisfaction_score >= 3:  # User was okay with this intensity
-                    score += 1
-                    
-            # Consider past workout type satisfaction
-            ex_type = exercise.get('exercise_type')
-            if ex_type in avg_type_satisfaction:
-                type_satisfaction_score = avg_type_satisfaction[ex_type]
-                if type_satisfaction_score >= 4:  # User really liked this type
-                    score += 2
-                elif type_satisfaction_score >= 3:  # User was okay with this type
-                    score += 1
-                    
-            # Adjust based on fitness level and intensity match
-            if fitness_level == "Beginner" and intensity == "Low":
-                score += 1
-            elif fitness_level == "Intermediate" and intensity == "Moderate":
-                score += 1
-            elif fitness_level == "Advanced" and intensity == "High":
-                score += 1
-                
-            scored_exercises.append((score, exercise))
-        
-        # Sort by score and use exercise name as secondary key for stable sorting
-        sorted_exercises = [ex for _, ex in sorted(
-            scored_exercises,
-            key=lambda x: (x[0], x[1].get('name', '')),
-            reverse=True
-        )]
-        return sorted_exercises
-
-    def _balance_muscle_groups(self, categorized_exercises: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
-        """Ensure balanced distribution of muscle groups"""
+        avg_type_satisfaction = {t: total / count for t, (total, count) in type_stats.items()}
+        avg_intensity_satisfaction = {i: total / count for i, (total, count) in intensity_stats.items()}
+
+        def satisfaction_bonus(avg_satisfaction: Dict[str, float], value: Any) -> int:
+            satisfaction_score = avg_satisfaction.get(value)
+            if satisfaction_score is None:
+                return 0
+            if satisfaction_score >= 4:  # User really liked this type/intensity
+                return 2
+            if satisfaction_score >= 3:  # User was okay with this type/intensity
+                return 1
+            return 0
+
+        arrays = self._ex_arrays
+        type_scores = np.array([
+            (2 if exercise_type and exercise_type in preferred_types else 0)
+            + satisfaction_bonus(avg_type_satisfaction, exercise_type)
+            for exercise_type in self._ex_vocab["type"]
+        ], dtype=float)
+        intensity_scores = np.array([
+            satisfaction_bonus(avg_intensity_satisfaction, intensity)
+            for intensity in self._ex_vocab["intensity"]
+        ], dtype=float)
+        return scores + type_scores[arrays["type"]] + intensity_scores[arrays["intensity"]]
+
+    def _apply_user_preferences(self, indices: List[int], scores: np.ndarray) -> List[int]:
+        """Order candidate exercises by the user's preference scores
+
+        Args:
+            indices: Positions into ``self.exercises`` of the candidate exercises
+            scores: Catalogue-wide scores from ``_score_exercises``
+
+        Returns:
+            The positions ordered from most to least preferred
+        """
+        if not indices:
+            return []
+        if len(indices) <= self._SMALL_CANDIDATES:
+            # Same order as _order_by_score: a stable sort on (score, name), descending
+            score, name_rank = scores.item, self._name_rank
+            return sorted(indices, key=lambda i: (score(i), name_rank[i]), reverse=True)
+        idx = np.asarray(indices, dtype=np.intp)
+        return self._order_by_score(idx, scores[idx])
+
+    def _order_by_score(self, idx: np.ndarray, scores: np.ndarray) -> List[int]:
+        """Order exercise positions by score and then name, both descending"""
+        arrays = self._ex_arrays
+        name_rank = arrays["name_rank"][idx]
+        if len(idx) > self._PREFERENCE_CAP:
+            # Keep the top exercises without sorting the whole category. Scores step
+            # by 0.5, so this single integer key orders by score, then name, then
+            # earlier position first, matching a stable sort on (score, name).
+            n = len(idx)
+            key = (np.rint(scores * 2).astype(np.int64) * len(arrays["name_rank"]) + name_rank) * n
+            key += np.arange(n - 1, -1, -1)
+            # Restore position order so the stable lexsort below keeps ties in place
+            top = np.sort(np.argpartition(-key, self._PREFERENCE_CAP)[:self._PREFERENCE_CAP])
+            idx, scores, name_rank = idx[top], scores[top], name_rank[top]
+        order = np.lexsort((-name_rank, -scores))
+        return idx[order].tolist()
+
+    def _balance_muscle_groups(self, categorized_exercises: Iterable[Tuple[str, List[int]]]) -> Dict[str, List[Dict]]:
+        """Ensure balanced distribution of muscle groups
+
+        Args:
+            categorized_exercises: (type, positions into ``self.exercises``) pairs
+        """
+        muscles = self._ex_cols["muscles"]
         balanced = {}
         
-        for workout_type, exercises in categorized_exercises.items():
-            muscle_group_count = defaultdict(int)
-            balanced_exercises = []
-            
-            # Count exercises per muscle group, skip if missing
-            for exercise in exercises:
-                for muscle in exercise.get('muscle_groups', []):
-                    muscle_group_count[muscle] += 1
+        for workout_type, indices in categorized_exercises:
+            picked = []
+            picked_set = set()
             
             # Balance selection
             selected_muscles = set()
-            for exercise in exercises:
+            for i in indices:
                 # Prioritize underrepresented muscle groups, skip if missing
-                muscle_groups = exercise.get('muscle_groups', [])
-                if not any(muscle in selected_muscles for muscle in muscle_groups):
-                    balanced_exercises.append(exercise)
-                    selected_muscles.update(muscle_groups)
+                if selected_muscles.isdisjoint(muscles[i]):
+                    picked.append(i)
+                    picked_set.add(i)
+                    selected_muscles.update(muscles[i])
             
             # Add remaining exercises
-            remaining = [ex for ex in exercises if ex not in balanced_exercises]
-            balanced_exercises.extend(remaining)
+            picked.extend(i for i in indices if i not in picked_set)
             
-            balanced[workout_type] = balanced_exercises
+            balanced[workout_type] = [self.exercises[i] for i in picked]
         return balanced
 
     def _generate_progressive_parameters(self, fitness_level: str, goal: str) -> Dict[str, Any]:
@@ -508,8 +640,8 @@ class WorkoutRecommender:
                 }
             }
             
-        adapted = template.copy()
-        structure = template.get("structure", {})
+        # Templates are shared between recommenders, so adapt a copy of the structure
+        structure = dict(template.get("structure", {}))
         
         if preferred_types is None:
             preferred_types = []
@@ -526,18 +658,22 @@ class WorkoutRecommender:
                 for day in rest_days[:-1]:  # Keep at least one rest day
                     structure[day] = "Active Recovery"
                 
+        # Nothing else to adapt without preferences
+        if not preferred_types:
+            return {"goal": template.get("goal"), "structure": structure}
+
         # Incorporate preferred workout types
-        for day, workout_type in structure.items():
-            if workout_type not in ["Rest", "Active Recovery"]:
-                if "HIIT" in preferred_types and day in ["Tuesday", "Thursday"]:
+        preferred = set(preferred_types)
+        for day, workout_type in list(structure.items()):
+            if workout_type not in ("Rest", "Active Recovery"):
+                if "HIIT" in preferred and day in ("Tuesday", "Thursday"):
                     structure[day] = "HIIT"
-                elif "Strength" in preferred_types and day in ["Monday", "Friday"]:
+                elif "Strength" in preferred and day in ("Monday", "Friday"):
                     structure[day] = "Strength"
-                elif "Core" in preferred_types and workout_type == "Strength":
+                elif "Core" in preferred and workout_type == "Strength":
                     structure[day] = "Core"
                         
-        adapted["structure"] = structure
-        return adapted
+        return {"goal": template.get("goal"), "structure": structure}
 
     def generate_workout_plan(self, user: UserProfile, last_workout: Dict[str, Any] = None) -> WorkoutPlan:
         """Generate personalized workout plan for user
@@ -558,40 +694,52 @@ class WorkoutRecommender:
         user.past_workouts.append(last_workout)
             
         try:
-            # Get user attributes with defaults
-            injuries = getattr(user, 'injuries', [])
-            equipment = getattr(user, 'equipment', [])
-            preferred_workouts = getattr(user, 'preferred_workouts', [])
-            fitness_level = getattr(user, 'fitness_level', "Beginner")
-            goal = getattr(user, 'goal', "General Fitness")
+            # Get user attributes, with defaults for any that are missing
+            try:
+                injuries, equipment, preferred_workouts, fitness_level, goal, past_workouts = _USER_FIELDS(user)
+            except AttributeError:
+                injuries = getattr(user, 'injuries', [])
+                equipment = getattr(user, 'equipment', [])
+                preferred_workouts = getattr(user, 'preferred_workouts', [])
+                fitness_level = getattr(user, 'fitness_level', "Beginner")
+                goal = getattr(user, 'goal', "General Fitness")
+                past_workouts = getattr(user, 'past_workouts', [])
+            preferred_workouts = [sys.intern(p) for p in preferred_workouts]
+
+            # Hash-based lookups for the filters below
+            inj_set = frozenset(map(sys.intern, injuries))
+            eq_set = frozenset(map(sys.intern, equipment))
             
-            # Step 1: Filter exercises by safety rules and equipment
-            safe_exercises = self._filter_exercises_by_injury(self.exercises, injuries)
-            available_exercises = self._filter_exercises_by_equipment(safe_exercises, equipment)
+            # Step 1: Filter exercises by safety rules and equipment, grouped by type
+            categorized_exercises = self._filter_and_categorize(inj_set, eq_set)
             
-            if not available_exercises:
+            if not categorized_exercises:
                 # Fallback to bodyweight exercises if no equipment matches
-                available_exercises = [ex for ex in self.exercises if not ex.get('equipment_needed')]
-            
-            # Step 2: Apply user preferences and consider past workouts
-            preferred_exercises = self._apply_user_preferences(
-                available_exercises,
-                preferred_workouts,
-                fitness_level,
-                getattr(user, 'past_workouts', [])
-            )
-            
-            # Step 3: Categorize and balance exercises
-            categorized_exercises = self._categorize_exercises(preferred_exercises)
-            balanced_exercises = self._balance_muscle_groups(categorized_exercises)
+                categorized_exercises = self._filter_and_categorize(frozenset(), frozenset())
             
-            # Step 4: Get personalized template based on goal and preferences
+            # Step 2: Get personalized template based on goal and preferences
             template = self._get_workout_template(goal)
             adapted_template = self._adapt_template_to_preferences(
                 template,
                 preferred_workouts,
                 fitness_level
             )
+            # Only the categories scheduled in the template are ever used
+            needed_types = {
+                t for t in adapted_template["structure"].values()
+                if t not in ("Rest", "Active Recovery")
+            }
+            
+            # Step 3: Apply user preferences and consider past workouts per needed category
+            scores = self._score_exercises(preferred_workouts, fitness_level, past_workouts)
+            preferred_exercises = (
+                (workout_type, self._apply_user_preferences(indices, scores))
+                for workout_type, indices in categorized_exercises.items()
+                if workout_type in needed_types
+            )
+            
+            # Step 4: Balance exercises as each category is scored
+            balanced_exercises = self._balance_muscle_groups(preferred_exercises)
         except AttributeError as e:
             print(f"Warning: Missing user attribute - {str(e)}")
             # Use defaults if attributes are missing
@@ -624,39 +772,36 @@ class WorkoutRecommender:
     def _generate_weekly_plan(self, exercises_by_type: Dict[str, List[Dict]],
                               template: Dict[str, Any],
                               params: Dict[str, Any],
-                              injuries: List[str]) -> Dict[str, Dict[str, Any]]:
+                              injuries: List[str]) -> Dict[str, DayPlan]:
         """Generate a 7-day workout plan"""
         plan = {}
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         day_schedule = self._create_day_schedule(template)
+        # Sorted once so the injuries can key the exercise notes cache
+        injuries = tuple(sorted(injuries))
 
-        for i, day in enumerate(days):
+        for i, day in enumerate(_DAYS):
             workout_type = day_schedule[i] if i < len(day_schedule) else "Rest"
 
             if workout_type == "Rest":
-                plan[day] = {"type": "Rest", "exercises": []}
+                plan[day] = DayPlan("Rest", [])
             elif workout_type == "Active Recovery":
-                plan[day] = {"type": "Active Recovery", "exercises": []}
+                plan[day] = DayPlan("Active Recovery", [])
             else:
                 # Get exercises for this workout type
                 available_for_type = exercises_by_type.get(workout_type, [])
                 selected_exercises = self._select_exercises(available_for_type, workout_type, params, injuries)
 
-                plan[day] = {
-                    "type": workout_type,
-                    "exercises": selected_exercises
-                }
+                plan[day] = DayPlan(workout_type, selected_exercises)
 
         return plan
 
     def _create_day_schedule(self, template: Dict[str, Any]) -> List[str]:
         """Create workout schedule for the week"""
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         structure = template.get("structure", {})
         
         # If it's a daily schedule, use it directly
-        if any(day in structure for day in days):
-            return [structure.get(day, "Rest") for day in days]
+        if not _DAYS_SET.isdisjoint(structure):
+            return [structure.get(day, "Rest") for day in _DAYS]
             
         # Otherwise, create a schedule from the workout type counts
         schedule = []
@@ -690,28 +835,18 @@ class WorkoutRecommender:
     def _select_exercises(self, available_exercises: List[Dict],
                           workout_type: str,
                           params: Dict[str, Any],
-                          injuries: List[str]) -> List[Dict[str, Any]]:
+                          injuries: Tuple[str, ...]) -> List[Dict[str, Any]]:
         """Select appropriate exercises for workout type"""
         if not available_exercises:
             return []
 
-        # Map workout types to exercise types
-        type_mapping = {
-            "Strength": ["Strength", "Resistance"],
-            "HIIT": ["HIIT", "Cardio"],
-            "Cardio": ["Cardio", "HIIT"],
-            "Core": ["Strength"],  # Core exercises are usually strength-based
-            "Flexibility": ["Flexibility", "Mobility"],
-            "Mobility": ["Mobility", "Flexibility"]
-        }
-        
-        valid_types = type_mapping.get(workout_type, [workout_type])
+        valid_types = self._TYPE_MAPPING.get(workout_type) or frozenset([workout_type.lower()])
         
         # Filter exercises by mapped types and ensure they're in the right format
         type_exercises = []
         for ex in available_exercises:
             ex_type = ex.get("exercise_type", "")
-            if isinstance(ex_type, str) and ex_type.lower() in [t.lower() for t in valid_types]:
+            if isinstance(ex_type, str) and ex_type.lower() in valid_types:
                 # For Core workouts, also check muscle groups
                 if workout_type == "Core" and "Core" not in ex.get("muscle_groups", []):
                     continue
@@ -722,39 +857,53 @@ class WorkoutRecommender:
             return []
 
         # Select 2-3 exercises randomly
-        import random
-        num_exercises = min(random.randint(2, 3), len(type_exercises))
-        selected = random.sample(type_exercises, num_exercises)
-
-        # Add parameters to each exercise
-        enhanced_exercises = []
-        for exercise in selected:
-            enhanced_exercise = exercise.copy()
-            # Use exercise-specific params if available, otherwise use defaults
-            enhanced_exercise.update({
+        num_exercises = min(_rng.randint(2, 3), len(type_exercises))
+        selected = _rng.sample(type_exercises, num_exercises)
+
+        # Add parameters to each exercise, building each result dict in one step.
+        # Use exercise-specific params if available, otherwise use defaults
+        enhanced_exercises = [
+            {
+                **exercise,
                 "sets": exercise.get("sets", params.get("sets", 3)),
                 "reps": exercise.get("reps", params.get("reps", 12)),
                 "rest_period": exercise.get("rest_period", params.get("rest", "60s")),
                 "notes": self._generate_exercise_notes(exercise, injuries)
-            })
-            enhanced_exercises.append(enhanced_exercise)
+            }
+            for exercise in selected
+        ]
 
         return enhanced_exercises
 
-    def _generate_exercise_notes(self, exercise: Dict[str, Any], injuries: List[str]) -> str:
+    def _generate_exercise_notes(self, exercise: Dict[str, Any], injuries: Tuple[str, ...]) -> str:
         """Generate safety notes for exercises based on injuries"""
+        # Only catalogue exercises are cached: self.exercises keeps them alive, so
+        # their ids cannot be reused by other dicts
+        restricted = self._injury_sets.get(id(exercise))
+        key = None
+        if restricted is None:
+            restricted = frozenset(exercise.get("injury_restrictions") or ())
+        else:
+            key = (id(exercise), injuries)
+            cached = self._notes_cache.get(key)
+            if cached is not None:
+                return cached
+
         notes = []
 
-        # Check for injury-specific notes
-        for injury in injuries:
-            if injury in exercise.get("injury_restrictions", []):
-                notes.append(f"Alternative: {', '.join(exercise.get('alternatives', ['None']))}")
+        # Check for injury-specific notes, one per restricted injury
+        if injuries and not restricted.isdisjoint(injuries):
+            alternative = f"Alternative: {', '.join(exercise.get('alternatives', ['None']))}"
+            notes.extend(alternative for injury in injuries if injury in restricted)
 
         # Add general safety notes
         if exercise.get("intensity") == "High":
             notes.append("Monitor form carefully")
 
-        return "; ".join(notes) if notes else "Perform with proper form"
+        result = "; ".join(notes) if notes else "Perform with proper form"
+        if key is not None:
+            self._notes_cache[key] = result
+        return result
 
 
 # Example usage
@@ -2,54 +2,93 @@
 Utility functions for the Workout Recommender System
 """
 
+import functools
 import json
 import os
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, FrozenSet, List, Union
 
+try:
+    import orjson
+except ImportError:  # Optional faster parser
+    orjson = None
 
-def load_json_data(file_path: str) -> Union[Dict, List]:
-    """Load JSON data from file with multiple fallback strategies"""
+
+def _parse_json_file(file_path: str) -> Any:
+    """Parse JSON data from file with multiple fallback strategies"""
+    # Read once; every strategy below works on this buffer
+    with open(file_path, 'rb') as file:
+        raw = file.read()
+
+    # First try: Fast path with orjson when available
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # Fall back to the lenient strategies below
+
+    # Second try: Standard JSON loading
+    content = raw.decode('utf-8').strip()
     try:
-        # First try: Standard JSON loading
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read().strip()
-            try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        # If the main content has extra data, try cleaning it
+        if "Extra data" in str(e):
+            # Find the last valid JSON bracket/brace
+            last_brace = content.rstrip().rfind(']')
+            if last_brace == -1:
+                last_brace = content.rstrip().rfind('}')
+            if last_brace != -1:
+                content = content[:last_brace+1]
                 return json.loads(content)
-            except json.JSONDecodeError as e:
-                # If the main content has extra data, try cleaning it
-                if "Extra data" in str(e):
-                    # Find the last valid JSON bracket/brace
-                    last_brace = content.rstrip().rfind(']')
-                    if last_brace == -1:
-                        last_brace = content.rstrip().rfind('}')
-                    if last_brace != -1:
-                        content = content[:last_brace+1]
-                        return json.loads(content)
-                
-                # If that didn't work, try line-by-line loading
-                file.seek(0)
-                data = []
-                for line in file:
-                    line = line.strip()
-                    if line and not line.startswith('//') and not line.startswith('#'):
-                        try:
-                            data.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
-                if data:
-                    return data
-                raise
+        
+        # If that didn't work, try line-by-line loading
+        data = []
+        for line in content.splitlines():
+            line = line.strip()
+            if line and not line.startswith('//') and not line.startswith('#'):
+                try:
+                    data.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        if data:
+            return data
+        raise
 
+
+def load_json_list(file_path: str) -> List:
+    """Load a JSON array from file, returning an empty list on failure"""
+    try:
+        data = _parse_json_file(file_path)
     except Exception as e:
         print(f"Error loading JSON from {os.path.basename(file_path)}: {str(e)}")
-        # Return empty structure based on file content hint
-        with open(file_path, 'r', encoding='utf-8') as file:
-            first_char = file.read(1).strip()
-            return [] if first_char == '[' else {}
+        return []
+    if not isinstance(data, list):
+        print(f"Error loading JSON from {os.path.basename(file_path)}: expected a list, got {type(data).__name__}")
+        return []
+    return data
+
+
+def load_json_obj(file_path: str) -> Dict:
+    """Load a JSON object from file, returning an empty dict on failure"""
+    try:
+        data = _parse_json_file(file_path)
+    except Exception as e:
+        print(f"Error loading JSON from {os.path.basename(file_path)}: {str(e)}")
+        return {}
+    if not isinstance(data, dict):
+        print(f"Error loading JSON from {os.path.basename(file_path)}: expected an object, got {type(data).__name__}")
+        return {}
+    return data
 
 
 def save_json_data(data: Union[Dict, List], file_path: str) -> None:
     """Save data to a JSON file"""
+    if orjson is not None:
+        # orjson encodes straight to bytes; keep json.dump's int-key handling
+        with open(file_path, 'wb') as file:
+            file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+
     with open(file_path, 'w', encoding='utf-8') as file:
         json.dump(data, file, indent=2)
 
@@ -58,8 +97,27 @@ def calculate_similarity(list1: list, list2: list) -> float:
     if not list1 or not list2:
         return 0.0
 
-    set1, set2 = set(list1), set(list2)
-    intersection = len(set1.intersection(set2))
-    union = len(set1.union(set2))
+    return calculate_similarity_pre(frozenset(list1), frozenset(list2))
+
+
+def calculate_similarity_pre(set1: FrozenSet, set2: FrozenSet) -> float:
+    """Calculate similarity between two already-built frozensets"""
+    if not set1 or not set2:
+        return 0.0
+
+    # Similarity is symmetric, so normalize the argument order for the cache
+    if hash(set2) < hash(set1):
+        set1, set2 = set2, set1
+    return _jaccard_similarity(set1, set2)
+
+
+@functools.lru_cache(maxsize=4096)
+def _jaccard_similarity(set1: FrozenSet, set2: FrozenSet) -> float:
+    """Jaccard similarity of two frozensets, memoized per unique pair"""
+    if len(set1) > len(set2):
+        set1, set2 = set2, set1
+    # Count the overlap from the smaller set and derive the union size from it
+    intersection = sum(1 for item in set1 if item in set2)
+    union = len(set1) + len(set2) - intersection
 
     return intersection / union if union > 0 else 0.0
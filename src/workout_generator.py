@@ -2,44 +2,69 @@
 Workout Plan Formatting and Generation Utilities
 """
 
-from typing import Dict, Any
+import io
+from typing import Dict, Any, List
 
 from .data_models import UserProfile, WorkoutPlan
 
 
-def format_workout_plan(workout_plan: WorkoutPlan, user: UserProfile) -> str:
-    """Format workout plan for display"""
-    output = ["=" * 70, f"PERSONALIZED WORKOUT PLAN FOR {user.name.upper()}", "=" * 70,
-              f"Goal: {user.goal} | Fitness Level: {user.fitness_level}",
-              f"Injuries: {', '.join(user.injuries) if user.injuries else 'None'}",
-              f"Equipment: {', '.join(user.equipment)}", "=" * 70]
-
-    # Header
-
-    # Weekly plan
+def generate_display_records(workout_plan: WorkoutPlan) -> List[Dict[str, Any]]:
+    """Pre-format each day of the plan once for the text, PDF and preview renderers"""
+    records = []
     for day, workout in workout_plan.days.items():
-        output.append(f"\n{day.upper()}")
-        output.append("-" * 40)
-        output.append(f"Type: {workout['type']}")
-
-        if workout['exercises']:
-            output.append("")
-            for i, exercise in enumerate(workout['exercises'], 1):
-                output.append(f"{i}. {exercise['name']}")
+        lines = []
+        if workout.exercises:
+            for i, exercise in enumerate(workout.exercises, 1):
+                lines.append(f"{i}. {exercise['name']}")
                 if 'sets' in exercise:
-                    output.append(
+                    lines.append(
                         f"   Sets: {exercise['sets']} | Reps: {exercise['reps']} | Rest: {exercise['rest_period']}")
                 if exercise.get('notes'):
-                    output.append(f"   Note: {exercise['notes']}")
+                    lines.append(f"   Note: {exercise['notes']}")
         else:
-            if workout['type'] == "Rest":
-                output.append("   Complete rest day - focus on recovery")
-            elif workout['type'] == "Active Recovery":
-                output.append("   Light stretching or yoga")
+            if workout.type == "Rest":
+                lines.append("   Complete rest day - focus on recovery")
+            elif workout.type == "Active Recovery":
+                lines.append("   Light stretching or yoga")
             else:
-                output.append("   No suitable exercises available")
+                lines.append("   No suitable exercises available")
+
+        records.append({
+            "day": day,
+            "type": workout.type,
+            "has_exercises": bool(workout.exercises),
+            "lines": lines
+        })
+    return records
 
-    return "\n".join(output)
+
+def format_workout_plan(workout_plan: WorkoutPlan, user: UserProfile) -> str:
+    """Format workout plan for display"""
+    buf = io.StringIO()
+    w = buf.write
+
+    # Header
+    w("=" * 70)
+    w(f"\nPERSONALIZED WORKOUT PLAN FOR {user.name.upper()}\n")
+    w("=" * 70)
+    w(f"\nGoal: {user.goal} | Fitness Level: {user.fitness_level}")
+    w(f"\nInjuries: {', '.join(user.injuries) if user.injuries else 'None'}")
+    w(f"\nEquipment: {', '.join(user.equipment) or 'None'}\n")
+    w("=" * 70)
+
+    # Weekly plan
+    for record in generate_display_records(workout_plan):
+        w(f"\n\n{record['day'].upper()}\n")
+        w("-" * 40)
+        w(f"\nType: {record['type']}")
+
+        if record['has_exercises']:
+            w("\n")
+        for line in record['lines']:
+            w("\n")
+            w(line)
+
+    return buf.getvalue()
 
 
 def generate_detailed_plan(workout_plan: WorkoutPlan, user: UserProfile) -> Dict[str, Any]:
@@ -51,7 +76,10 @@ def generate_detailed_plan(workout_plan: WorkoutPlan, user: UserProfile) -> Dict
             "goal": user.goal,
             "fitness_level": user.fitness_level
         },
-        "weekly_plan": workout_plan.days,
+        "weekly_plan": {
+            day: {"type": workout.type, "exercises": workout.exercises}
+            for day, workout in workout_plan.days.items()
+        },
         "metadata": {
             "generated_at": "2024-01-01",  # In real implementation, use datetime
             "version": "1.0"
@@ -4,13 +4,30 @@ Streamlit GUI for Workout Recommender System
 import streamlit as st
 from fpdf import FPDF
 import json
+import sys
+from collections import OrderedDict
 from datetime import datetime
 import os
 
 from src.recommender import WorkoutRecommender
 from src.data_models import UserProfile
+from src.workout_generator import generate_display_records
+
+# Multiselect placeholder meaning "nothing selected"
+_NONE_OPTION = "None"
+
+# Generated plans and PDFs kept per session, most recently used last
+_PLAN_CACHE_SIZE = 8
+
+@st.cache_resource
+def get_recommender():
+    """Build the recommender once per server process and reuse it across reruns"""
+    return WorkoutRecommender()
+
+def create_pdf(user, workout_plan, records=None):
+    if records is None:
+        records = generate_display_records(workout_plan)
 
-def create_pdf(user, workout_plan):
     pdf = FPDF()
     pdf.add_page()
     
@@ -35,7 +52,7 @@ def create_pdf(user, workout_plan):
     if user.injuries:
         pdf.cell(0, 10, f"Injuries: {', '.join(user.injuries)}", ln=True)
     
-    pdf.cell(0, 10, f"Available Equipment: {', '.join(user.equipment)}", ln=True)
+    pdf.cell(0, 10, f"Available Equipment: {', '.join(user.equipment) or 'None'}", ln=True)
     pdf.ln(10)
     
     # Weekly Plan
@@ -43,29 +60,15 @@ def create_pdf(user, workout_plan):
     pdf.cell(0, 10, "Weekly Workout Schedule", ln=True)
     pdf.ln(5)
     
-    for day, workout in workout_plan.days.items():
+    for record in records:
         # Day header
         pdf.set_font("Arial", "B", 14)
         pdf.set_fill_color(240, 240, 240)
-        pdf.cell(0, 10, day.upper(), ln=True, fill=True)
+        pdf.cell(0, 10, record['day'].upper(), ln=True, fill=True)
         
+        # Day body, emitted as a single multi-line cell
         pdf.set_font("Arial", "", 12)
-        pdf.cell(0, 10, f"Type: {workout['type']}", ln=True)
-        
-        if workout['exercises']:
-            for i, exercise in enumerate(workout['exercises'], 1):
-                pdf.cell(0, 10, f"{i}. {exercise['name']}", ln=True)
-                if 'sets' in exercise:
-                    pdf.cell(0, 10, 
-                        f"   Sets: {exercise['sets']} | Reps: {exercise['reps']} | " 
-                        f"Rest: {exercise['rest_period']}", ln=True)
-                if exercise.get('notes'):
-                    pdf.cell(0, 10, f"   Note: {exercise['notes']}", ln=True)
-        else:
-            if workout['type'] == "Rest":
-                pdf.cell(0, 10, "   Complete rest day - focus on recovery", ln=True)
-            elif workout['type'] == "Active Recovery":
-                pdf.cell(0, 10, "   Light stretching or yoga", ln=True)
+        pdf.multi_cell(0, 10, "\n".join([f"Type: {record['type']}", *record['lines']]), align="L")
         pdf.ln(5)
     
     # Footer
@@ -218,66 +221,67 @@ def main():
             gender=gender,
             goal=goal,
             fitness_level=fitness_level,
-            injuries=[inj for inj in injuries if inj != "None"],
-            preferred_workouts=preferred_workouts,
-            equipment=equipment,
+            injuries=[sys.intern(inj) for inj in injuries if inj != _NONE_OPTION],
+            preferred_workouts=[sys.intern(w) for w in preferred_workouts],
+            equipment=[sys.intern(e) for e in equipment if e != _NONE_OPTION],
             past_workouts=[]  # Could be added as a feature later
         )
         
-        # Generate workout plan
-        recommender = WorkoutRecommender()
-        workout_plan = recommender.generate_workout_plan(user, previous_workout)
+        # Reuse the plan and PDF from an identical earlier request in this session
+        cache_key = (
+            name, age, gender, goal, fitness_level,
+            tuple(user.injuries), tuple(user.equipment), tuple(user.preferred_workouts),
+            tuple(sorted(previous_workout.items()))
+        )
+        plan_cache = st.session_state.setdefault('plan_cache', OrderedDict())
+        cached = plan_cache.get(cache_key)
+        if cached is not None:
+            plan_cache.move_to_end(cache_key)
+            pdf_bytes, workout_plan, records = cached
+        else:
+            # Generate workout plan
+            recommender = get_recommender()
+            workout_plan = recommender.generate_workout_plan(user, previous_workout)
+            
+            # Create PDF in memory
+            # Format the plan once for both the PDF and the preview
+            records = generate_display_records(workout_plan)
+            pdf = create_pdf(user, workout_plan, records)
+            
+            # Generate PDF bytes; PyFPDF returns a latin-1 str, fpdf2 returns bytes directly
+            pdf_output = pdf.output(dest='S')
+            pdf_bytes = pdf_output.encode('latin1') if isinstance(pdf_output, str) else bytes(pdf_output)
+            
+            plan_cache[cache_key] = (pdf_bytes, workout_plan, records)
+            if len(plan_cache) > _PLAN_CACHE_SIZE:
+                plan_cache.popitem(last=False)
         
         # Store the current workout for next time
         st.session_state['last_workout'] = {
             'completed': True,
-            'workout_type': workout_plan.days['Monday']['type'],  # Use first day's type
+            'workout_type': workout_plan.days['Monday'].type,  # Use first day's type
             'satisfaction': 3,  # Default satisfaction
             'intensity': 'Moderate'  # Default intensity
         }
         
-        # Create PDF in memory
-        pdf = create_pdf(user, workout_plan)
         pdf_filename = f"workout_plan_{user.name.lower().replace(' ', '_')}.pdf"
         
-        # Generate PDF bytes with proper encoding
-        from io import BytesIO
-        pdf_output = pdf.output(dest='S').encode('latin1')
-        pdf_buffer = BytesIO(pdf_output)
-        
         # Display success message and download button
         st.success("Workout plan generated successfully!")
         
         st.download_button(
             label="Download Workout Plan (PDF)",
-            data=pdf_buffer,
+            data=pdf_bytes,
             file_name=pdf_filename,
                 mime="application/pdf"
             )
         
         # Display preview
         st.subheader("Preview")
-        for day, workout in workout_plan.days.items():
-            with st.expander(f"{day.upper()} - {workout['type']}", expanded=True):
-                if workout['exercises']:
-                    for i, exercise in enumerate(workout['exercises'], 1):
-                        st.write(f"{i}. {exercise['name']}")
-                        sets = exercise.get('sets')
-                        reps = exercise.get('reps')
-                        rest = exercise.get('rest_period')
-                        if sets and reps and rest:
-                            st.write(f"   Sets: {sets} | Reps: {reps} | Rest: {rest}")
-                        else:
-                            st.write("   No set/rep/rest info available.")
-                        if exercise.get('notes'):
-                            st.write(f"   Note: {exercise['notes']}")
-                else:
-                    if workout['type'] == "Rest":
-                        st.write("Complete rest day - focus on recovery")
-                    elif workout['type'] == "Active Recovery":
-                        st.write("Light stretching or yoga")
-                    else:
-                        st.write("No exercises assigned for this day.")
+        for record in records:
+            with st.expander(f"{record['day'].upper()} - {record['type']}", expanded=True):
+                for line in record['lines']:
+                    st.write(line)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,114 @@
+"""
+Tests for the workout recommender
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from src.recommender import WorkoutRecommender
+
+
+@pytest.fixture
+def catalogue_recommender(tmp_path):
+    """Recommender over a large catalogue with many repeated exercise names"""
+    rng = random.Random(7)
+    names = ["Resistance Band Rows", "Bodyweight Squats", "Plank", "Burpees"]
+    workouts = [
+        {
+            "name": rng.choice(names),
+            "exercise_type": "Strength",
+            "muscle_groups": ["Legs"],
+            "equipment_needed": [],
+            "intensity": rng.choice(["Low", "Moderate", "High"]),
+            "difficulty": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+            "injury_restrictions": [],
+            "alternatives": []
+        }
+        for _ in range(200)
+    ]
+    (tmp_path / "exercises.json").write_text(json.dumps({"workouts": workouts}))
+    (tmp_path / "workout_templates.json").write_text("[]")
+    return WorkoutRecommender(str(tmp_path))
+
+
+def test_order_by_score_matches_stable_sort_above_cap(catalogue_recommender):
+    recommender = catalogue_recommender
+    names = [exercise["name"] for exercise in recommender.exercises]
+    rng = random.Random(11)
+
+    for _ in range(50):
+        positions = sorted(rng.sample(range(len(names)), 150))
+        scores = [rng.choice([0.0, 0.5, 1.0, 1.5, 2.0]) for _ in positions]
+        # The original implementation: a stable sort on (score, name), descending
+        expected = [
+            position for position, _ in sorted(
+                zip(positions, scores), key=lambda item: (item[1], names[item[0]]), reverse=True
+            )
+        ][:recommender._PREFERENCE_CAP]
+
+        result = recommender._order_by_score(np.array(positions, dtype=np.intp), np.array(scores))
+        assert result == expected
+
+
+def test_exercise_notes_for_short_lived_dicts_are_not_shared():
+    recommender = WorkoutRecommender()
+    injuries = ("Knee Injury",)
+
+    # Build and drop each dict in turn so CPython is free to reuse its id
+    unrestricted = recommender._generate_exercise_notes(
+        {"name": "Plank", "intensity": "Low", "injury_restrictions": [], "alternatives": []}, injuries)
+    restricted = recommender._generate_exercise_notes(
+        {"name": "Jump Squats", "intensity": "Low", "injury_restrictions": ["Knee Injury"],
+         "alternatives": ["Wall Sit"]}, injuries)
+
+    assert unrestricted == "Perform with proper form"
+    assert restricted == "Alternative: Wall Sit"
+
+
+def test_plan_exercises_do_not_share_mutable_lists_with_the_catalogue():
+    from src.data_models import UserProfile
+
+    user = UserProfile(user_id="U1", name="Test", age=30, gender="Female", goal="Weight Loss",
+                       fitness_level="Beginner", injuries=[], preferred_workouts=["Cardio"],
+                       equipment=["Dumbbells"], past_workouts=[])
+    plan = WorkoutRecommender().generate_workout_plan(user, {"completed": True})
+    exercise = next(ex for day in plan.days.values() for ex in day.exercises)
+
+    for key in ("muscle_groups", "equipment_needed", "injury_restrictions", "alternatives"):
+        assert not isinstance(exercise.get(key), list)
+
+
+def test_exercise_database_cannot_drift_from_its_position_index():
+    recommender = WorkoutRecommender()
+
+    # Columns, score arrays and postings are indexed by position
+    assert isinstance(recommender.exercises, tuple)
+    assert [ex["name"] for ex in recommender.exercises] == recommender._ex_cols["name"]
+
+
+def test_small_candidate_lists_match_the_numpy_ordering(catalogue_recommender):
+    recommender = catalogue_recommender
+    rng = random.Random(13)
+
+    for _ in range(50):
+        positions = sorted(rng.sample(range(len(recommender.exercises)), recommender._SMALL_CANDIDATES))
+        scores = np.array([rng.choice([0.0, 0.5, 1.0, 1.5, 2.0]) for _ in recommender.exercises])
+
+        result = recommender._apply_user_preferences(positions, scores)
+        idx = np.array(positions, dtype=np.intp)
+        assert result == recommender._order_by_score(idx, scores[idx])
+
+
+def test_unrated_history_takes_the_cold_start_path():
+    recommender = WorkoutRecommender()
+    level_scores = recommender._level_scores["Beginner"]
+
+    # generate_workout_plan always appends the last workout, so history is never empty
+    unrated = [{"completed": True}, {"completed": False, "workout_type": "HIIT", "intensity": "High"}]
+    assert recommender._score_exercises([], "Beginner", unrated) is level_scores
+
+    rated = [{"completed": True, "workout_type": "Cardio", "satisfaction": 5}]
+    assert recommender._score_exercises([], "Beginner", rated) is not level_scores